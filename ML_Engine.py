@@ -1,5 +1,8 @@
+import os
 import re
+import threading
 import joblib
+import numpy as np
 
 # ==================================================
 # NORMAL RANGES (Clinical Safety Layer)
@@ -16,21 +19,50 @@ NORMAL_RANGES = {
     "creatinine": (0.6, 1.3),
 }
 
+RISK_LABELS = ["LOW", "MEDIUM", "HIGH"]
+
+# Clinical override thresholds (applied on top of the ML prediction)
+SEVERITY_OVERRIDE = 4
+HIGH_COUNT_OVERRIDE = 2
+
 # ==================================================
 # RANDOM FOREST MODEL LOADER
 # ==================================================
 
 class RiskModel:
-    def __init__(self, model_path="offline_model/risk_model_v2_clinical.pkl"):
+    def __init__(self, model_path="offline_model/risk_model_v2_clinical.pkl", n_jobs=None):
         try:
             self.model = joblib.load(model_path)
         except Exception as e:
             raise RuntimeError(f"❌ Failed to load model: {e}")
+        # The forest is trained with n_jobs=-1; cap it inside server workers
+        if n_jobs:
+            self.model.n_jobs = n_jobs
 
     def predict(self, feature_vector):
         pred = self.model.predict([feature_vector])[0]
         prob = self.model.predict_proba([feature_vector])[0]
-        return ["LOW", "MEDIUM", "HIGH"][pred], prob
+        return RISK_LABELS[pred], prob
+
+    def predict_batch(self, feature_matrix):
+        """Scores a 2D array of feature vectors in a single vectorized call."""
+        preds = self.model.predict(feature_matrix)
+        probs = self.model.predict_proba(feature_matrix)
+        return np.asarray(RISK_LABELS)[preds], probs
+
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_model():
+    """Loads the risk model once per process, sized by MEDISENSE_WORKER_THREADS."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = RiskModel(n_jobs=int(os.environ.get("MEDISENSE_WORKER_THREADS", 0)) or None)
+    return _model
 
 
 # ==================================================
@@ -150,19 +182,20 @@ def build_feature_vector(patient_features, clinical_info):
 # FINAL PIPELINE
 # ==================================================
 
-def run_pipeline(structured_input):
-    patient_features, clinical_info = normalize_structured_input(structured_input)
+def run_pipeline(structured_input, normalized=None):
+    # `normalized` lets callers that already ran normalize_structured_input skip a second pass
+    patient_features, clinical_info = normalized or normalize_structured_input(structured_input)
 
     feature_vector = build_feature_vector(patient_features, clinical_info)
 
-    model = RiskModel()
+    model = get_model()
     ml_risk, confidence = model.predict(feature_vector)
 
     # 🔒 Clinical override
-    if severity_score := feature_vector[-1] >= 4:
+    if severity_score := feature_vector[-1] >= SEVERITY_OVERRIDE:
         final_risk = "HIGH"
         reason = "High cumulative severity score"
-    elif feature_vector[-2] >= 2:
+    elif feature_vector[-2] >= HIGH_COUNT_OVERRIDE:
         final_risk = "HIGH"
         reason = "Multiple abnormal lab values"
     else:
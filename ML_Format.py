@@ -49,17 +49,20 @@ def pretty_marker(key):
 # MAIN PIPELINE FUNCTION (for server.py integration)
 # ==================================================
 
-def run_pipeline(structured_input=None):
+def run_pipeline(structured_input=None, normalized=None):
     """
     Main pipeline function that processes structured medical data
     and RETURNS a formatted analysis report as a string.
+    Pass `normalized` (output of normalize_structured_input) to reuse it.
     """
     if structured_input is None:
         structured_input = DEFAULT_STRUCTURED_INPUT
 
     # Run ML processing
-    patient, clinical_info = normalize_structured_input(structured_input)
-    report, final_risk = ml_run_pipeline(structured_input)
+    if normalized is None:
+        normalized = normalize_structured_input(structured_input)
+    patient, clinical_info = normalized
+    report, final_risk = ml_run_pipeline(structured_input, normalized)
     build_feature_vector(patient, clinical_info) 
 
     # Initialize list to hold output lines
@@ -0,0 +1,281 @@
+import os
+import json
+import time
+import tarfile
+import zipfile
+import argparse
+from multiprocessing import Pool
+
+import numpy as np
+import pandas as pd
+
+from NLP_Engine import NLPEngine
+from ML_Engine import (
+    RiskModel,
+    SEVERITY_OVERRIDE,
+    HIGH_COUNT_OVERRIDE,
+    normalize_structured_input,
+    build_feature_vector,
+)
+
+# ==================================================
+# OFFLINE BULK RE-SCORING
+# ==================================================
+#
+# Re-runs parsing + scoring over an archive of stored OCR outputs and writes
+# a CSV diff of the decisions made by two model versions.
+#
+#   python ML_Rescore.py archive/ \
+#       --old-model offline_model/risk_model_v1.pkl \
+#       --new-model offline_model/risk_model_v2_clinical.pkl \
+#       --output reports/rescore_diff.csv
+#
+# Memory is bounded by --chunk-size: only one chunk of reports is held in
+# memory at a time. After every chunk a checkpoint is written next to the
+# output, so an interrupted run picks up where it stopped.
+
+FEATURE_NAMES = [
+    "age",
+    "hemoglobin",
+    "wbc_count",
+    "platelet_count",
+    "crp",
+    "esr",
+    "glucose_fasting",
+    "creatinine",
+    "low_count",
+    "high_count",
+    "severity_score",
+]
+
+REPORT_EXTENSIONS = (".txt",)
+
+
+# ==================================================
+# ARCHIVE READERS
+# ==================================================
+
+def _is_report(name):
+    return name.lower().endswith(REPORT_EXTENSIONS)
+
+
+def iter_reports(source, skip=0):
+    """
+    Streams (report_id, text) pairs from a directory, .zip or .tar(.gz) archive.
+    The order is deterministic so a run can be resumed by skipping `skip` reports.
+    """
+    if os.path.isdir(source):
+        names = []
+        for root, _, files in os.walk(source):
+            for f in files:
+                if _is_report(f):
+                    names.append(os.path.relpath(os.path.join(root, f), source))
+        for name in sorted(names)[skip:]:
+            with open(os.path.join(source, name), encoding="utf-8", errors="replace") as fh:
+                yield name, fh.read()
+
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as zf:
+            names = sorted(n for n in zf.namelist() if _is_report(n))
+            for name in names[skip:]:
+                yield name, zf.read(name).decode("utf-8", errors="replace")
+
+    elif tarfile.is_tarfile(source):
+        # Tar archives are read sequentially, in member order
+        seen = 0
+        with tarfile.open(source, mode="r|*") as tf:
+            for member in tf:
+                if not member.isfile() or not _is_report(member.name):
+                    continue
+                seen += 1
+                if seen <= skip:
+                    continue
+                yield member.name, tf.extractfile(member).read().decode("utf-8", errors="replace")
+
+    else:
+        raise ValueError(f"❌ Unsupported report source: {source}")
+
+
+def _take(iterator, n):
+    chunk = []
+    for item in iterator:
+        chunk.append(item)
+        if len(chunk) == n:
+            break
+    return chunk
+
+
+# ==================================================
+# PARSING WORKERS
+# ==================================================
+
+_engine = None
+
+
+def _init_worker():
+    global _engine
+    # Parsing does not need the ONNX session or tokenizer
+    _engine = NLPEngine()
+
+
+def parse_report(item):
+    """Worker: raw OCR text -> feature vector (or an error message)."""
+    report_id, text = item
+    try:
+        structured = _engine.process(text)
+        patient_features, clinical_info = normalize_structured_input(structured)
+        return report_id, build_feature_vector(patient_features, clinical_info), None
+    except Exception as e:
+        return report_id, None, str(e)
+
+
+# ==================================================
+# VECTORIZED SCORING
+# ==================================================
+
+def score_chunk(model, X):
+    """Scores a feature matrix and applies the clinical override, row-wise."""
+    ml_risk, probs = model.predict_batch(X)
+    override = (X[:, -1] >= SEVERITY_OVERRIDE) | (X[:, -2] >= HIGH_COUNT_OVERRIDE)
+    final_risk = np.where(override, "HIGH", ml_risk)
+    return ml_risk, final_risk, probs.max(axis=1)
+
+
+def build_diff_frame(report_ids, X, errors, old_model, new_model):
+    frame = pd.DataFrame({"report_id": report_ids, "error": errors})
+
+    ok = np.array([e is None for e in errors])
+    for i, name in enumerate(FEATURE_NAMES):
+        col = np.full(len(report_ids), np.nan)
+        col[ok] = X[:, i]
+        frame[name] = col
+
+    for tag, model in (("old", old_model), ("new", new_model)):
+        ml_col = np.full(len(report_ids), None, dtype=object)
+        final_col = np.full(len(report_ids), None, dtype=object)
+        conf_col = np.full(len(report_ids), np.nan)
+        if ok.any():
+            ml_risk, final_risk, confidence = score_chunk(model, X)
+            ml_col[ok] = ml_risk
+            final_col[ok] = final_risk
+            conf_col[ok] = confidence
+        frame[f"{tag}_ml_risk"] = ml_col
+        frame[f"{tag}_final_risk"] = final_col
+        frame[f"{tag}_confidence"] = conf_col
+
+    frame["changed"] = ok & (frame["old_final_risk"] != frame["new_final_risk"])
+    return frame
+
+
+# ==================================================
+# CHECKPOINTS
+# ==================================================
+
+def load_checkpoint(path):
+    if not path or not os.path.exists(path):
+        return {"processed": 0, "output_bytes": 0, "changed": 0, "errors": 0}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_checkpoint(path, state):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+# ==================================================
+# MAIN
+# ==================================================
+
+def rescore(source, old_model_path, new_model_path, output, workers=None, chunk_size=4096, resume=True):
+    if chunk_size < 1:
+        # A non-positive chunk would make _take read the whole archive at once
+        raise ValueError(f"❌ chunk_size must be at least 1, got {chunk_size}")
+    checkpoint_path = output + ".checkpoint.json"
+    state = load_checkpoint(checkpoint_path if resume else None)
+
+    # Drop any rows written after the last checkpoint (e.g. a crash mid-chunk)
+    if state["processed"] and os.path.exists(output):
+        with open(output, "r+b") as f:
+            f.truncate(state["output_bytes"])
+        print(f"♻️ Resuming after {state['processed']} reports")
+    elif os.path.exists(output):
+        os.remove(output)
+
+    old_model = RiskModel(old_model_path)
+    new_model = RiskModel(new_model_path)
+
+    reports = iter_reports(source, skip=state["processed"])
+    started = time.perf_counter()
+    done_this_run = 0
+
+    workers = workers or os.cpu_count() or 1
+    per_task = max(1, chunk_size // (4 * workers))
+
+    with Pool(processes=workers, initializer=_init_worker) as pool:
+        while True:
+            batch = _take(reports, chunk_size)
+            if not batch:
+                break
+
+            parsed = pool.map(parse_report, batch, chunksize=per_task)
+            report_ids = [p[0] for p in parsed]
+            errors = [p[2] for p in parsed]
+            X = np.asarray([p[1] for p in parsed if p[1] is not None], dtype=float)
+            if X.size == 0:
+                X = X.reshape(0, len(FEATURE_NAMES))
+
+            frame = build_diff_frame(report_ids, X, errors, old_model, new_model)
+            frame.to_csv(output, mode="a", header=state["output_bytes"] == 0, index=False)
+
+            done_this_run += len(batch)
+            state["processed"] += len(batch)
+            state["output_bytes"] = os.path.getsize(output)
+            state["changed"] += int(frame["changed"].sum())
+            state["errors"] += int(frame["error"].notna().sum())
+            save_checkpoint(checkpoint_path, state)
+
+            elapsed = time.perf_counter() - started
+            print(f"📊 {state['processed']} reports | {done_this_run / elapsed:.1f} reports/sec")
+
+    elapsed = time.perf_counter() - started
+    throughput = done_this_run / elapsed if elapsed else 0.0
+
+    print("\n✅ Re-scoring complete")
+    print("Reports processed:", state["processed"])
+    print("Decisions changed:", state["changed"])
+    print("Parse errors:", state["errors"])
+    print(f"Throughput: {throughput:.1f} reports/sec")
+    print("💾 Diff report saved to", output)
+    return state, throughput
+
+
+def _positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-score archived OCR reports under two risk model versions.")
+    parser.add_argument("source", help="Directory, .zip or .tar(.gz) of OCR text files")
+    parser.add_argument("--old-model", required=True, help="Path to the previous model .pkl")
+    parser.add_argument("--new-model", default="offline_model/risk_model_v2_clinical.pkl", help="Path to the retrained model .pkl")
+    parser.add_argument("--output", default="rescore_diff.csv", help="CSV diff report to write")
+    parser.add_argument("--workers", type=_positive_int, default=None, help="Parser processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=_positive_int, default=4096, help="Reports held in memory and scored per batch")
+    parser.add_argument("--no-resume", action="store_true", help="Ignore any existing checkpoint and start over")
+    args = parser.parse_args()
+
+    rescore(
+        args.source,
+        args.old_model,
+        args.new_model,
+        args.output,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        resume=not args.no_resume,
+    )
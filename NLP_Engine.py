@@ -1,14 +1,24 @@
+import os
 import re
 import json
+import threading
 import numpy as np
 import onnxruntime as ort
 from tokenizers import Tokenizer
 
 class NLPEngine:
-    def __init__(self, model_path, tokenizer_path):
+    def __init__(self, model_path=None, tokenizer_path=None, intra_op_threads=None):
         # Load the ONNX model for offline inference
-        self.session = ort.InferenceSession(model_path)
-        self.tokenizer = Tokenizer.from_file(tokenizer_path)
+        # (parsing-only callers such as ML_Rescore pass None to skip loading it)
+        self.session = None
+        if model_path:
+            options = ort.SessionOptions()
+            if intra_op_threads:
+                # Cap the per-process pool so server workers don't oversubscribe cores
+                options.intra_op_num_threads = intra_op_threads
+                options.inter_op_num_threads = 1
+            self.session = ort.InferenceSession(model_path, sess_options=options)
+        self.tokenizer = Tokenizer.from_file(tokenizer_path) if tokenizer_path else None
         # Headers used as anchors for report slicing
         self.headers = ["USER_INFO", "LAB_INFO", "TESTS_AND_VALUES", "REMARKS_AND_RESULTS", "DOCTOR_INFO"]
 
@@ -80,9 +90,25 @@ class NLPEngine:
             }
         }
     
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_engine():
+    """Returns the per-process engine, loading the model only once even under threaded servers."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = NLPEngine(
+                    "./offline_model/model.onnx",
+                    "./offline_model/tokenizer.json",
+                    intra_op_threads=int(os.environ.get("MEDISENSE_WORKER_THREADS", 0)) or None,
+                )
+    return _engine
+
 def analyse(report):
-    engine = NLPEngine("./offline_model/model.onnx", "./offline_model/tokenizer.json")
-    return engine.process(report)
+    # Reuse one engine per process instead of reloading the model on every request
+    return get_engine().process(report)
 
 if __name__ == "__main__":
     # Point to the folder created by your exporter script
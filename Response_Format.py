@@ -0,0 +1,155 @@
+import json
+import time
+import copy
+from functools import lru_cache
+
+# ==================================================
+# GAUGE METADATA (frontend visualization ranges)
+# ==================================================
+
+DEFAULT_GAUGE = {"min": 0, "max": 100, "normalRange": (20, 80), "slightlyAbnormalRange": (10, 90)}
+
+# Custom ranges for common Hematology tests. Order matters: the first
+# substring found in the lowercased test name wins. Ranges are tuples so the
+# shared table can't be mutated through an enriched test.
+GAUGE_RANGES = [
+    ("wbc", {"min": 0, "max": 20, "normalRange": (4, 11), "slightlyAbnormalRange": (3, 13)}),
+    ("neutrophils %", {"min": 0, "max": 100, "normalRange": (40, 75), "slightlyAbnormalRange": (35, 80)}),
+    ("lymphocytes %", {"min": 0, "max": 100, "normalRange": (20, 45), "slightlyAbnormalRange": (15, 50)}),
+    ("monocytes %", {"min": 0, "max": 20, "normalRange": (2, 10), "slightlyAbnormalRange": (1, 12)}),
+    ("eosinophils %", {"min": 0, "max": 15, "normalRange": (1, 6), "slightlyAbnormalRange": (0.5, 8)}),
+    ("haemoglobin", {"min": 5, "max": 20, "normalRange": (12, 16), "slightlyAbnormalRange": (10, 18)}),
+    ("hematocrit", {"min": 20, "max": 60, "normalRange": (36, 46), "slightlyAbnormalRange": (33, 50)}),
+    ("rbc", {"min": 2, "max": 8, "normalRange": (4, 5.5), "slightlyAbnormalRange": (3.5, 6)}),
+    ("platelet", {"min": 0, "max": 600, "normalRange": (150, 450), "slightlyAbnormalRange": (130, 500)}),
+    ("mcv", {"min": 50, "max": 120, "normalRange": (80, 100), "slightlyAbnormalRange": (75, 105)}),
+]
+
+_encode = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+
+
+def _gauge_entry(meta):
+    # (metadata dict, pre-serialized JSON members without the surrounding braces)
+    return meta, _encode(meta)[1:-1]
+
+
+# Built once at import time
+_GAUGE_TABLE = [(needle, _gauge_entry(meta)) for needle, meta in GAUGE_RANGES]
+_DEFAULT_ENTRY = _gauge_entry(DEFAULT_GAUGE)
+
+
+@lru_cache(maxsize=4096)
+def lookup_gauge(test_name):
+    """Returns the (metadata, serialized fragment) gauge entry for a test name."""
+    name = test_name.lower()
+    for needle, entry in _GAUGE_TABLE:
+        if needle in name:
+            return entry
+    return _DEFAULT_ENTRY
+
+
+# ==================================================
+# ENRICHMENT
+# ==================================================
+
+def enrich_test_results(test_results, observations):
+    """
+    Single enrichment pass over a report's tests.
+
+    Reuses the numeric values already parsed by ML_Engine.normalize_structured_input
+    (`observations` is aligned 1:1 with `test_results`) and returns the gauge
+    entries for encode_response instead of copying them into every test dict.
+    Unlike the old float(value) conversion this takes the first number in the
+    value, so "measuring 2 x 3 cm" plots as 2.0 rather than 0.
+    """
+    gauges = []
+    for test, obs in zip(test_results, observations):
+        numeric = obs["numeric"]
+        test['value'] = numeric if numeric is not None else 0
+        gauges.append(lookup_gauge(test['test_name']))
+    return gauges
+
+
+# ==================================================
+# RESPONSE ENCODER
+# ==================================================
+
+def _join_members(obj_json, fragment):
+    if obj_json == "{}":
+        return "{" + fragment + "}"
+    return obj_json[:-1] + "," + fragment + "}"
+
+
+def encode_response(response_data, gauges):
+    """Compact JSON body with the pre-serialized gauge metadata spliced into each test."""
+    rows = ",".join(
+        _join_members(_encode(test), fragment)
+        for test, (_, fragment) in zip(response_data['test_results'], gauges)
+    )
+    rest = {k: v for k, v in response_data.items() if k != 'test_results'}
+    return _join_members(_encode(rest), '"test_results":[' + rows + "]")
+
+
+# ==================================================
+# BENCHMARK
+# ==================================================
+
+if __name__ == "__main__":
+    from ML_Engine import normalize_structured_input
+
+    PANEL = [
+        ("WBC COUNT", "7.2", "x10^9/L"),
+        ("NEUTROPHILS %", "61", "%"),
+        ("LYMPHOCYTES %", "30", "%"),
+        ("MONOCYTES %", "6", "%"),
+        ("EOSINOPHILS %", "3", "%"),
+        ("HAEMOGLOBIN", "14.1", "g/dL"),
+        ("HEMATOCRIT", "42", "%"),
+        ("RBC COUNT", "4.9", "million/uL"),
+        ("PLATELET COUNT", "250", "x10^9/L"),
+        ("MCV", "88", "fL"),
+        ("SERUM CREATININE", "1.0", "mg/dL"),
+        ("CRP", "positive", "N/A"),
+    ]
+    N_TESTS = 500
+    ROUNDS = 200
+
+    report = {
+        "patient_metadata": {"name": "Benchmark", "age": "40 YRS", "gender": "F"},
+        "test_results": [
+            {"test_name": name, "value": value, "unit": unit, "status": "Normal"}
+            for name, value, unit in (PANEL[i % len(PANEL)] for i in range(N_TESTS))
+        ],
+        "clinical_remarks": "N/A",
+        "summary": "Benchmark summary",
+    }
+    _, clinical_info = normalize_structured_input(report)
+    observations = clinical_info["observations"]
+
+    def enrich_with_ranges(test):
+        # Previous per-test enrichment from backend.py, kept only as the baseline
+        try:
+            test['value'] = float(test['value'])
+        except ValueError:
+            test['value'] = 0
+
+        meta = lookup_gauge(test['test_name'])[0]
+        test.update({key: list(value) if isinstance(value, tuple) else value for key, value in meta.items()})
+
+    def per_test(data):
+        for test in data['test_results']:
+            enrich_with_ranges(test)
+        # Same output as flask.jsonify, which the endpoint used before
+        return json.dumps(data, separators=(",", ":"), sort_keys=True)
+
+    def single_pass(data):
+        gauges = enrich_test_results(data['test_results'], observations)
+        return encode_response(data, gauges)
+
+    for label, fn in (("per-test enrich + jsonify", per_test), ("single pass + encoder", single_pass)):
+        copies = [copy.deepcopy(report) for _ in range(ROUNDS)]
+        start = time.perf_counter()
+        for data in copies:
+            body = fn(data)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<30} {elapsed / ROUNDS * 1000:.3f} ms/report  ({len(body)} bytes)")
@@ -0,0 +1,173 @@
+import os
+import sys
+import time
+import uuid
+import argparse
+import tempfile
+import subprocess
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+# ==================================================
+# LOAD-TEST PROFILE
+# ==================================================
+#
+#   python loadtest.py --workers 1 2 4 8 --duration 20
+#
+# Starts serve.py once per worker count with the OCR call replaced by
+# stub_ocr (no network, no Gemini quota) and hammers /analyze with
+# concurrent uploads. Prints requests/sec per worker count so throughput
+# scaling with cores can be compared. The NLP and ML stages run for real,
+# so the offline_model folder must be present.
+
+SAMPLE_REPORT = """
+[USER_INFO]
+Patient Name: Load Test
+Age: 42 YRS
+Gender: F
+ID: 0001
+
+[LAB_INFO]
+Clinic/Laboratory Name: Benchmark Laboratory
+Address: N/A
+Tel: +91 12345 67890
+
+[TESTS_AND_VALUES]
+HEMOGLOBIN: 11.2 g/dl L
+WBC COUNT: 12.5 x10^9/L H
+NEUTROPHILS %: 68 %
+LYMPHOCYTES %: 24 %
+MONOCYTES %: 6 %
+EOSINOPHILS %: 2 %
+RBC COUNT: 4.1 million/uL
+HEMATOCRIT: 35 %
+PLATELET COUNT: 210 x10^9/L
+MCV: 86 fL
+
+[REMARKS_AND_RESULTS]
+Mild anaemia with leukocytosis. Clinical correlation advised.
+
+[DOCTOR_INFO]
+Doctor's Name: Dr. Load Test
+Specialization: Pathology
+Referred by: Self
+"""
+
+
+def stub_ocr(image_path):
+    """Drop-in for ocr.perform_structured_ocr that returns a canned report."""
+    return SAMPLE_REPORT
+
+
+# ==================================================
+# CLIENT
+# ==================================================
+
+def _multipart(filename, payload):
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f"Content-Type: application/octet-stream\r\n\r\n"
+    ).encode() + payload + f"\r\n--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def _post_report(url, worker_id):
+    body, content_type = _multipart(f"loadtest_{worker_id}.png", b"stub")
+    req = urllib.request.Request(url, data=body, headers={"Content-Type": content_type})
+    with urllib.request.urlopen(req, timeout=60) as resp:
+        resp.read()
+        return resp.status == 200
+
+
+def _wait_until_ready(ready_dir, workers, timeout=180):
+    # serve.py drops one file per worker once its models are loaded
+    deadline = time.time() + timeout
+    ready = 0
+    while time.time() < deadline:
+        ready = len(os.listdir(ready_dir))
+        if ready >= workers:
+            return
+        time.sleep(0.5)
+    raise RuntimeError(
+        f"❌ Only {ready} of {workers} workers became ready (is gunicorn installed?)"
+    )
+
+
+def _hammer(url, concurrency, duration):
+    deadline = time.time() + duration
+
+    def loop(worker_id):
+        ok = failed = 0
+        while time.time() < deadline:
+            try:
+                if _post_report(url, worker_id):
+                    ok += 1
+                else:
+                    failed += 1
+            except OSError:
+                failed += 1
+        return ok, failed
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(loop, range(concurrency)))
+    return sum(r[0] for r in results), sum(r[1] for r in results)
+
+
+# ==================================================
+# PROFILE
+# ==================================================
+
+def run_profile(workers, threads, concurrency, duration, port):
+    with tempfile.TemporaryDirectory() as ready_dir:
+        cmd = [
+            sys.executable, "serve.py",
+            "--host", "127.0.0.1",
+            "--port", str(port),
+            "--workers", str(workers),
+            "--threads", str(threads),
+            "--ocr-backend", "loadtest:stub_ocr",
+            "--ready-dir", ready_dir,
+        ]
+        server = subprocess.Popen(
+            cmd,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            # Every worker has loaded its models before the clock starts
+            _wait_until_ready(ready_dir, workers)
+            url = f"http://127.0.0.1:{port}/analyze"
+
+            start = time.perf_counter()
+            ok, failed = _hammer(url, concurrency, duration)
+            elapsed = time.perf_counter() - start
+            return ok / elapsed, failed
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    cores = os.cpu_count() or 1
+    default_workers = sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1)))
+
+    parser = argparse.ArgumentParser(description="Measure /analyze throughput against a stubbed OCR backend.")
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers, help="Worker counts to profile")
+    parser.add_argument("--threads", type=int, default=4, help="Request threads per worker")
+    parser.add_argument("--concurrency", type=int, default=None, help="Client connections (default: 4 x workers)")
+    parser.add_argument("--duration", type=float, default=15, help="Seconds per worker count")
+    parser.add_argument("--port", type=int, default=5055)
+    args = parser.parse_args()
+
+    print(f"📊 Load test on {cores} cores, {args.duration:.0f}s per profile")
+    print(f"{'workers':>8} {'req/sec':>10} {'speedup':>8} {'errors':>7}")
+
+    baseline = None
+    for workers in args.workers:
+        rps, failed = run_profile(workers, args.threads, args.concurrency or 4 * workers, args.duration, args.port)
+        baseline = baseline or rps
+        speedup = rps / baseline if baseline else 0.0
+        print(f"{workers:>8} {rps:>10.1f} {speedup:>7.2f}x {failed:>7}")
@@ -0,0 +1,137 @@
+import os
+import sys
+import argparse
+import importlib
+import importlib.util
+
+# ==================================================
+# PRODUCTION SERVER
+# ==================================================
+#
+#   python serve.py --workers 4 --threads 4 --port 5000
+#
+# Runs the app factory from backend.py under gunicorn (multi-process,
+# threaded workers) or, where gunicorn is unavailable (Windows), under
+# waitress (single process, threaded). Every worker gets an equal share
+# of the cores for onnxruntime, BLAS and the random forest, so workers
+# don't oversubscribe the machine.
+#
+# numpy / onnxruntime read their thread settings at import time, so this
+# module must not import backend (or anything that imports numpy) at the top.
+
+BLAS_THREAD_VARS = [
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+]
+
+
+def configure_worker_threads(workers, threads_per_worker=None):
+    """Splits the cores evenly across workers and exports the per-worker limits."""
+    cores = os.cpu_count() or 1
+    per_worker = threads_per_worker or max(1, cores // workers)
+
+    # Read by NLP_Engine.get_engine (onnxruntime) and ML_Engine.get_model (sklearn)
+    os.environ["MEDISENSE_WORKER_THREADS"] = str(per_worker)
+    for var in BLAS_THREAD_VARS:
+        os.environ.setdefault(var, str(per_worker))
+    return per_worker
+
+
+def load_callable(spec):
+    """Imports a 'module:function' string."""
+    module_name, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def build_app(ocr_backend_spec=None):
+    from backend import create_app
+    import NLP_Engine
+    import ML_Engine
+
+    app = create_app(load_callable(ocr_backend_spec) if ocr_backend_spec else None)
+    # Load the models before the worker accepts requests, not inside the first one
+    NLP_Engine.get_engine()
+    ML_Engine.get_model()
+    return app
+
+
+def _mark_ready(ready_dir):
+    # One file per warmed-up worker; loadtest.py waits for all of them
+    if ready_dir:
+        os.makedirs(ready_dir, exist_ok=True)
+        open(os.path.join(ready_dir, str(os.getpid())), "w").close()
+
+
+def run_gunicorn(host, port, workers, threads, timeout, ocr_backend_spec=None, ready_dir=None):
+    from gunicorn.app.base import BaseApplication
+
+    class MediSenseApplication(BaseApplication):
+        def __init__(self, options):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            # Called in each worker after fork, so every worker owns its models
+            return build_app(ocr_backend_spec)
+
+    MediSenseApplication({
+        "bind": f"{host}:{port}",
+        "workers": workers,
+        "threads": threads,
+        "worker_class": "gthread",
+        "timeout": timeout,
+        "post_worker_init": lambda worker: _mark_ready(ready_dir),
+    }).run()
+
+
+def run_waitress(host, port, threads, ocr_backend_spec=None, ready_dir=None):
+    from waitress import serve
+    app = build_app(ocr_backend_spec)
+    _mark_ready(ready_dir)
+    serve(app, host=host, port=port, threads=threads)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run MediSense under a production WSGI server.")
+    parser.add_argument("--host", default=os.environ.get("MEDISENSE_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("MEDISENSE_PORT", 5000)))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("MEDISENSE_WORKERS", os.cpu_count() or 1)),
+                        help="Worker processes (gunicorn only, default: CPU count)")
+    parser.add_argument("--threads", type=int, default=int(os.environ.get("MEDISENSE_THREADS", 4)),
+                        help="Request threads per worker")
+    parser.add_argument("--compute-threads", type=int, default=None,
+                        help="onnxruntime/BLAS threads per worker (default: cores / workers)")
+    parser.add_argument("--timeout", type=int, default=120, help="Worker timeout in seconds (gunicorn only)")
+    parser.add_argument("--server", choices=["auto", "gunicorn", "waitress"], default="auto")
+    parser.add_argument("--ocr-backend", default=None,
+                        help="'module:function' replacing ocr.perform_structured_ocr (used by loadtest.py)")
+    parser.add_argument("--ready-dir", default=None,
+                        help="Directory where each worker drops a file once its models are loaded (used by loadtest.py)")
+    args = parser.parse_args(argv)
+
+    server = args.server
+    if server == "auto":
+        server = "waitress" if sys.platform == "win32" or importlib.util.find_spec("gunicorn") is None else "gunicorn"
+
+    if server == "waitress" and args.workers > 1:
+        reason = "gunicorn is not installed" if sys.platform != "win32" and args.server == "auto" else "waitress is single-process"
+        print(f"⚠️ {reason}: running 1 worker instead of the {args.workers} requested")
+    workers = args.workers if server == "gunicorn" else 1
+    compute_threads = configure_worker_threads(workers, args.compute_threads)
+    print(f"🚀 {server}: {workers} worker(s) x {args.threads} thread(s), {compute_threads} compute thread(s) per worker")
+
+    if server == "gunicorn":
+        run_gunicorn(args.host, args.port, workers, args.threads, args.timeout, args.ocr_backend, args.ready_dir)
+    else:
+        run_waitress(args.host, args.port, args.threads, args.ocr_backend, args.ready_dir)
+
+
+if __name__ == "__main__":
+    main()